@@ -2,11 +2,14 @@
 import random
 import socket                # Python implementation of Berkeley Software Distribution (BSD) socket interface
 import sys
+import integrity
+import load_generator
+import packet_trace
 import unreliable_network
 
 
-def run_client(filename, failure_probability, protocol, window_size, file_bytes_received, packets_received,
-               retransmitted_file_bytes_received, retransmitted_packets_received):
+def run_client(filename, failure_probability, protocol, window_size, integrity_algorithm, file_bytes_received,
+               packets_received, retransmitted_file_bytes_received, retransmitted_packets_received):
     """
     Runs client process for downloading a file from a content distributing server with simulated network unreliability.
     
@@ -14,9 +17,13 @@ def run_client(filename, failure_probability, protocol, window_size, file_bytes_
     :param failure_probability: probability of unsuccessful data transmission over UDP (float between 0 and 1)
     :param protocol: pipelining mechanism for custom protocol over UDP (Go-Back-N or Selective Repeat)
     :param window_size: size of sliding receiver window
+    :param integrity_algorithm: name of integrity check requested for packets and ACKs of session (see integrity.py)
     :return: None
     """
 
+    # integrity check must match the one of the server session, otherwise server rejects download request
+    integrity_check = integrity.get_integrity_check(integrity_algorithm)
+
     # for security & demonstration reasons, client address is IPv4 loopback address (inaccessible to outer networks)
     # IPv4 address used instead of "localhost" domain to avoid non-deterministic behaviour through DNS resolution
     client_ip = "127.0.0.1"
@@ -40,7 +47,7 @@ def run_client(filename, failure_probability, protocol, window_size, file_bytes_
     print("")
     print("")
 
-    download_request = f"Send {filename}"
+    download_request = f"Send {filename} {integrity_algorithm}"
     client_socket.sendto(download_request.encode(), server_address)
 
     #############################################################################################################
@@ -50,66 +57,102 @@ def run_client(filename, failure_probability, protocol, window_size, file_bytes_
     # each client process tracks next in-order sequence number expected to be sent by server process (Go-Back-N sender)
     receiver_base = 0
 
+    # download request is lost if sent before server socket is bound (start_session.py launches server and clients
+    # simultaneously) -> repeat it every second until server answers
+    server_answered = False
+    client_socket.settimeout(1)
+
     # Go-Back-N (bidirectional) communication loop for file receipt and ACKs
     download_ongoing = True
     while download_ongoing:
-        # receive incoming packet data sent by contacted server
-        received_data, server_address = client_socket.recvfrom(4096)
-
-        # analyse content of received data
-        server_message_fields = received_data.decode().split(":", 2)
-        sender_checksum = server_message_fields[0]
-        sequence_number_field = server_message_fields[1].split(",")
-        sequence_number = sequence_number_field[0]
-        server_payload = server_message_fields[2]
+        # receive incoming packet data sent by contacted server (maximum UDP datagram size, file data chunks may exceed
+        # a few KB)
+        try:
+            received_data, server_address = client_socket.recvfrom(65535)
+        except socket.timeout:
+            if not server_answered:
+                client_socket.sendto(download_request.encode(), server_address)
+            continue
+        server_answered = True
+
+        # server rejects clients requesting another integrity check than the one of its session
+        if received_data.startswith("Rejected".encode()):
+            print(received_data.decode())
+            client_socket.close()
+            return
+
+        # upon receiving closing indicator, server indicates to client that download is complete
+        if received_data.split(":".encode(), 1)[-1] == "12345:DOWNLOAD_COMPLETE".encode():
+            download_ongoing = False
+            break
+
+        # analyse content of received data as bytestring, as sequence number is a raw byte and payload binary file data
+        # -> other datagrams (e.g. greeting message of server during registration) are skipped
+        packet_fields = load_generator.parse_server_packet(received_data)
+        if packet_fields is None:
+            continue
+        sender_checksum, encoded_sqn_nr, is_retransmission, server_payload = packet_fields
+        sequence_number = int.from_bytes(encoded_sqn_nr, byteorder=sys.byteorder)
+        # payload size computed once per packet (shared by tracing and receiving statistics)
+        payload_size = len(server_payload)
 
         # check whether server message was not corrupted by unreliable network channel
-        receiver_checksum = unreliable_network.checksum(sequence_number.encode() + server_payload.encode())
+        receiver_checksum = integrity_check(encoded_sqn_nr + server_payload)
 
         if sender_checksum == receiver_checksum:
-            # client reaction depending on received sequence number (and message content in case of completed download)
-            if int(sequence_number) == receiver_base:
+            # client reaction depending on received sequence number
+            if sequence_number == receiver_base:
+                packet_trace.trace(packet_trace.EVENT_RECEIVE, client_port, server_address, sequence_number,
+                                   payload_size, packet_trace.FLAG_IN_ORDER |
+                                   (packet_trace.FLAG_RETRANSMISSION if is_retransmission else 0))
+
                 # client receives expected sequence number -> acknowledge receipt by advancing client sliding window...
                 receiver_base += 1
 
                 # ... and sending ACK message to server for this sequence number
-                acked_sequence_number = int(sequence_number).to_bytes(1, byteorder=sys.byteorder)
+                acked_sequence_number = encoded_sqn_nr
                 ack_payload = "ACK".encode()
-                ack_checksum = unreliable_network.checksum(acked_sequence_number + ack_payload).encode()
+                ack_checksum = integrity_check(acked_sequence_number + ack_payload).encode()
                 byte_ack_message = ack_checksum + ":".encode() + acked_sequence_number + ":".encode() + ack_payload
 
                 # try sending ACK message via underlying (unreliable) network to client
                 was_acked = unreliable_network.prob_send(client_socket, byte_ack_message, server_address, failure_probability)
+                packet_trace.trace_send(was_acked, packet_trace.EVENT_ACK_SENT, client_port, server_address,
+                                        sequence_number, len(byte_ack_message))
 
                 # if ACK sending was successful, update receiving statistics
                 if was_acked:
                     # if received file data was transmitted first time by server
-                    if len(sequence_number_field) == 1:
-                        file_bytes_received += len(server_payload.encode())
+                    if not is_retransmission:
+                        file_bytes_received += payload_size
                         packets_received += 1
                     # if received message was re-transmitted by server
-                    elif len(sequence_number_field) > 1:
-                        retransmitted_file_bytes_received += len(server_payload.encode())
+                    else:
+                        retransmitted_file_bytes_received += payload_size
                         retransmitted_packets_received += 1
 
-            elif (int(sequence_number) > receiver_base) and (int(sequence_number) <= receiver_base + window_size - 1):
+            elif 0 < receiver_base and sequence_number <= receiver_base + window_size - 1:
+                packet_trace.trace(packet_trace.EVENT_RECEIVE, client_port, server_address, sequence_number,
+                                   payload_size, packet_trace.FLAG_RETRANSMISSION if is_retransmission else 0)
+
                 # received sequence number lies in Go-Back-N receiver window, BUT is not expected sequence number
                 # -> client then acknowledges highest IN-ORDER, YET-RECEIVED sequence number receiver_base–1 to server
+                # -> also for already received sequence numbers, as server re-transmits them if their ACK got lost
                 # -> personal choice: NO buffering of received sequence numbers higher than receiver_base in window
 
                 # send (duplicate) ACK message to server with receiver_base–1 as sequence number
                 acked_sequence_number = int(receiver_base - 1).to_bytes(1, byteorder=sys.byteorder)
                 ack_payload = "ACK".encode()
-                ack_checksum = unreliable_network.checksum(acked_sequence_number + ack_payload).encode()
+                ack_checksum = integrity_check(acked_sequence_number + ack_payload).encode()
                 byte_ack_message = ack_checksum + ":".encode() + acked_sequence_number + ":".encode() + ack_payload
 
                 # try sending (duplicate) ACK via underlying (unreliable) network to client
-                unreliable_network.prob_send(client_socket, byte_ack_message, server_address, failure_probability)
+                was_acked = unreliable_network.prob_send(client_socket, byte_ack_message, server_address, failure_probability)
+                packet_trace.trace_send(was_acked, packet_trace.EVENT_ACK_SENT, client_port, server_address,
+                                        receiver_base - 1, len(byte_ack_message))
 
-            elif int(sequence_number) == 12345:
-                # upon receiving this particular sequence number, server indicates to client that download is complete
-                download_ongoing = False
-                break
+        else:
+            packet_trace.trace(packet_trace.EVENT_CHECKSUM_FAILURE, client_port, server_address, -1, len(received_data))
 
     # release system resources by closing socket after file transmission completed and communicate statistics
     client_socket.close()
@@ -135,6 +178,11 @@ if __name__ == "__main__":
     failure_probability = float(sys.argv[2])
     pipeline_type = sys.argv[3]
     window_size = int(sys.argv[4])
+    # optional 5th argument: integrity check of session (RFC 1071 checksum if omitted, see integrity.py)
+    integrity_algorithm = sys.argv[5] if len(sys.argv) > 5 else integrity.DEFAULT_INTEGRITY_ALGORITHM
+
+    # optional per-packet tracing (enabled via PACKET_TRACE_DIR environment variable, see packet_trace.py)
+    packet_trace.start_tracing_from_environment("client")
 
     # global variables for receiving statistics, displayed after completion of file transmission
     file_bytes_received = 0
@@ -142,5 +190,5 @@ if __name__ == "__main__":
     retransmitted_file_bytes_received = 0
     retransmitted_packets_received = 0
 
-    run_client(file_name, failure_probability, pipeline_type, window_size,
+    run_client(file_name, failure_probability, pipeline_type, window_size, integrity_algorithm,
                file_bytes_received, packets_received, retransmitted_file_bytes_received, retransmitted_packets_received)
\ No newline at end of file
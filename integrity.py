@@ -0,0 +1,86 @@
+# imported modules
+import zlib                 # C implementation of CRC-32 (IEEE 802.3 polynomial) shipped with every Python installation
+import unreliable_network
+
+# optional C extension for CRC-32C (Castagnoli polynomial, hardware-accelerated via SSE 4.2 / ARMv8 instructions)
+# -> pip install crc32c, otherwise slower table-driven pure Python implementation below is used
+try:
+    import crc32c as crc32c_extension
+except ImportError:
+    crc32c_extension = None
+
+
+def crc32(byte_data):
+    """
+    Function to compute CRC-32 of data provided in byte format via zlib (C implementation)
+
+    :param byte_data: bytestring for which CRC-32 shall be computed
+    :return: string containing CRC-32 as 8 hexadecimal digits
+    """
+
+    return f"{zlib.crc32(byte_data):08x}"
+
+
+def build_crc32c_table():
+    """
+    Helper function building lookup table of table-driven CRC-32C for all 256 byte values (reflected Castagnoli
+    polynomial 0x82F63B78)
+
+    :return: list of 256 integers
+    """
+
+    crc_table = list()
+    for byte_value in range(256):
+        crc = byte_value
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x82F63B78 if crc & 1 else crc >> 1
+        crc_table.append(crc)
+
+    return crc_table
+
+
+CRC32C_TABLE = build_crc32c_table()
+
+
+def crc32c(byte_data):
+    """
+    Function to compute CRC-32C (Castagnoli) of data provided in byte format, using the crc32c C extension if installed
+
+    :param byte_data: bytestring for which CRC-32C shall be computed
+    :return: string containing CRC-32C as 8 hexadecimal digits
+    """
+
+    if crc32c_extension is not None:
+        return f"{crc32c_extension.crc32c(byte_data):08x}"
+
+    # table-driven fallback (processes one byte per lookup)
+    crc = 0xFFFFFFFF
+    for byte in byte_data:
+        crc = CRC32C_TABLE[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+
+    return f"{crc ^ 0xFFFFFFFF:08x}"
+
+
+# integrity algorithms selectable per transmission session (name -> function mapping bytestring to string digest)
+# -> digests never contain ":" (field separator of packets), RFC 1071 checksum is default for compatibility
+INTEGRITY_ALGORITHMS = {
+    "rfc1071": unreliable_network.checksum,
+    "crc32": crc32,
+    "crc32c": crc32c,
+}
+DEFAULT_INTEGRITY_ALGORITHM = "rfc1071"
+
+
+def get_integrity_check(algorithm_name):
+    """
+    Function looking up the integrity check agreed for a transmission session
+
+    :param algorithm_name: name of integrity algorithm ("rfc1071", "crc32" or "crc32c")
+    :return: function computing the digest (string) of a bytestring
+    """
+
+    if algorithm_name not in INTEGRITY_ALGORITHMS:
+        raise ValueError(f"Unknown integrity algorithm '{algorithm_name}', "
+                         f"choose one of {', '.join(INTEGRITY_ALGORITHMS)}.")
+
+    return INTEGRITY_ALGORITHMS[algorithm_name]
@@ -0,0 +1,106 @@
+# imported modules
+import random
+import sys
+import time
+import integrity
+import unreliable_network
+
+
+def measure_cost_per_mb(integrity_check, min_duration_s=0.5):
+    """
+    Measures computation time of an integrity check on 1MB of pseudo-random data
+
+    :param integrity_check: function computing the digest of a bytestring (see integrity.py)
+    :param min_duration_s: minimum measurement duration in seconds (check repeated until reached)
+    :return: average computation time per MB in seconds
+    """
+
+    byte_data = random.randbytes(1000000)
+    repetitions = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_duration_s:
+        integrity_check(byte_data)
+        repetitions += 1
+
+    return (time.perf_counter() - start) / repetitions
+
+
+def swap_words(byte_data):
+    """
+    Helper function swapping two distinct, 16-bit aligned words of data (reordering error invisible to RFC 1071 sums)
+
+    :param byte_data: data to be corrupted (in bytestring format, at least two different 16-bit words)
+    :return: corrupted copy of data (bytestring)
+    """
+
+    words_nr = len(byte_data) // 2
+    while True:
+        first_word, second_word = sorted(random.sample(range(words_nr), 2))
+        first_bytes = byte_data[2 * first_word:2 * first_word + 2]
+        second_bytes = byte_data[2 * second_word:2 * second_word + 2]
+        if first_bytes != second_bytes:
+            return (byte_data[:2 * first_word] + second_bytes + byte_data[2 * first_word + 2:2 * second_word]
+                    + first_bytes + byte_data[2 * second_word + 2:])
+
+
+def measure_detection_rate(integrity_check, corrupt, packet_size, trials):
+    """
+    Measures share of corrupted packets detected by an integrity check
+
+    :param integrity_check: function computing the digest of a bytestring (see integrity.py)
+    :param corrupt: function returning a corrupted copy of a bytestring
+    :param packet_size: size of pseudo-random packets in bytes
+    :param trials: number of corrupted packets
+    :return: detection rate (float between 0 and 1)
+    """
+
+    detected_nr = 0
+    for _ in range(trials):
+        packet = random.randbytes(packet_size)
+        if integrity_check(corrupt(packet)) != integrity_check(packet):
+            detected_nr += 1
+
+    return detected_nr / trials
+
+
+def run_benchmark(packet_size, trials):
+    """
+    Compares cost per MB and detection rate under the bit-corruption loss model of all integrity algorithms
+
+    :param packet_size: size of pseudo-random packets in bytes for detection rate measurement
+    :param trials: number of corrupted packets per algorithm and corruption model
+    :return: None
+    """
+
+    # corruption models: n flipped bits (see unreliable_network.flip_bits) and reordering of two 16-bit words
+    corruption_models = [(f"{bit_flips_nr} bit flips",
+                          lambda packet, flips_nr=bit_flips_nr: unreliable_network.flip_bits(packet, flips_nr))
+                         for bit_flips_nr in (1, 2, 3, 4, 8, 16)]
+    corruption_models.append(("16-bit word swap", swap_words))
+
+    if integrity.crc32c_extension is None:
+        print("crc32c C extension not installed (pip install crc32c), measuring pure Python CRC-32C fallback.")
+        print("")
+
+    print(f"--------------------------------------------------------------------------------------------")
+    print(f"{'algorithm':>10} {'ms/MB':>10} {'MB/s':>10}")
+    for algorithm_name, integrity_check in integrity.INTEGRITY_ALGORITHMS.items():
+        cost_per_mb = measure_cost_per_mb(integrity_check)
+        print(f"{algorithm_name:>10} {cost_per_mb * 1000:10.3f} {1 / cost_per_mb:10.1f}")
+
+    print(f"--------------------------------------------------------------------------------------------")
+    print(f"Detection rate for {trials} corrupted packets of {packet_size} bytes:")
+    print(f"{'corruption':>18}" + "".join(f"{algorithm_name:>10}" for algorithm_name in integrity.INTEGRITY_ALGORITHMS))
+    for model_name, corrupt in corruption_models:
+        detection_rates = [measure_detection_rate(integrity_check, corrupt, packet_size, trials)
+                           for integrity_check in integrity.INTEGRITY_ALGORITHMS.values()]
+        print(f"{model_name:>18}" + "".join(f"{detection_rate:10.4f}" for detection_rate in detection_rates))
+    print(f"--------------------------------------------------------------------------------------------")
+
+
+# run benchmark script, e.g. python3 integrity_benchmark.py 1000 2000 (packet size in bytes, trials per model)
+if __name__ == "__main__":
+    packet_size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    trials = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    run_benchmark(packet_size, trials)
@@ -0,0 +1,354 @@
+# imported modules
+import math
+import selectors            # high-level I/O multiplexing (epoll, kqueue or select depending on operating system)
+import socket               # Python implementation of Berkeley Software Distribution (BSD) socket interface
+import sys
+import time
+import integrity
+import packet_trace
+import unreliable_network
+
+
+def parse_server_packet(received_data):
+    """
+    Helper function splitting a datagram sent by the Go-Back-N server (see run_server function) into its fields.
+    Layout of file data packets: <checksum>:<1-byte sequence number>[,R]:<payload>
+
+    :param received_data: bytestring received from server socket
+    :return: 4-tuple (<checksum>, <encoded sequence number>, <retransmission flag>, <payload>), None if datagram is
+             no file data packet (e.g. greeting message of server during client registration)
+    """
+
+    # checksum field only consists of binary (RFC 1071) or hexadecimal (CRC) digits, i.e. first ":" always terminates
+    # it (whereas the single byte sequence number and the payload may contain ":" themselves)
+    checksum_end = received_data.find(b":")
+    if checksum_end <= 0 or received_data[0:checksum_end].strip(b"0123456789abcdef"):
+        return None
+
+    sender_checksum = received_data[0:checksum_end].decode()
+    encoded_sqn_nr = received_data[checksum_end + 1:checksum_end + 2]
+    sqn_field_end = checksum_end + 2
+
+    # re-transmitted packets are marked by ",R" appended to sequence number field
+    if received_data[sqn_field_end:sqn_field_end + 3] == b",R:":
+        return sender_checksum, encoded_sqn_nr, True, received_data[sqn_field_end + 3:]
+    elif received_data[sqn_field_end:sqn_field_end + 1] == b":":
+        return sender_checksum, encoded_sqn_nr, False, received_data[sqn_field_end + 1:]
+    else:
+        return None
+
+
+def percentile(sorted_values, fraction):
+    """
+    Helper function computing a percentile of an (ascending) sorted list via nearest-rank method
+
+    :param sorted_values: list of numbers sorted in ascending order
+    :param fraction: requested percentile as fraction (float between 0 and 1, e.g. 0.99 for 99th percentile)
+    :return: nearest-rank percentile value, None for an empty list
+    """
+
+    if not sorted_values:
+        return None
+
+    # nearest rank is ceil(fraction * n), but at least first and at most last rank
+    rank = min(max(1, math.ceil(fraction * len(sorted_values))), len(sorted_values))
+    return sorted_values[rank - 1]
+
+
+def receive_packet(client_socket, client, received_data, server_address):
+    """
+    Go-Back-N receiver-side handling of one datagram for one simulated client (mirrors run_client function)
+
+    :param client_socket: socket of simulated client
+    :param client: dictionary holding state and receiving statistics of simulated client
+    :param received_data: bytestring received from server
+    :param server_address: 2-tuple (<host>, <port>) of sending server
+    :return: None
+    """
+
+    # server rejects clients requesting another integrity check than the one of its session
+    if received_data.startswith(b"Rejected"):
+        client["rejected"] = True
+        return
+
+    # any datagram from server proves client registration, i.e. download request must not be repeated anymore
+    if client["registered_at"] is None:
+        client["registered_at"] = time.monotonic()
+
+    # upon receiving closing indicator, server signals to client that download is complete
+    if received_data.split(b":", 1)[-1] == b"12345:DOWNLOAD_COMPLETE":
+        client["completed_at"] = time.monotonic()
+        return
+
+    packet_fields = parse_server_packet(received_data)
+    if packet_fields is None:
+        return
+    sender_checksum, encoded_sqn_nr, is_retransmission, server_payload = packet_fields
+
+    # check whether server message was not corrupted by unreliable network channel
+    receiver_checksum = client["integrity_check"](encoded_sqn_nr + server_payload)
+    if sender_checksum != receiver_checksum:
+        packet_trace.trace(packet_trace.EVENT_CHECKSUM_FAILURE, client["address"][1], server_address, -1,
+                           len(received_data))
+        return
+
+    sequence_number = int.from_bytes(encoded_sqn_nr, byteorder=sys.byteorder)
+    if client["first_packet_at"] is None:
+        client["first_packet_at"] = time.monotonic()
+    trace_flags = packet_trace.FLAG_RETRANSMISSION if is_retransmission else 0
+    is_in_order = sequence_number == client["receiver_base"]
+
+    if is_in_order:
+        # expected sequence number -> advance client sliding window and acknowledge sequence number
+        client["receiver_base"] += 1
+        acked_sequence_number = encoded_sqn_nr
+        trace_flags |= packet_trace.FLAG_IN_ORDER
+
+        # keep file data in memory unless payloads are discarded (saves memory for large client swarms)
+        # -> stored whether or not ACK gets lost below, as receiver window has advanced past this packet anyway
+        if client["file_data"] is not None:
+            client["file_data"] += server_payload
+    elif 0 < client["receiver_base"] and sequence_number <= client["receiver_base"] + client["window_size"] - 1:
+        # out-of-order sequence number in receiver window -> (duplicate) ACK for receiver_base–1, no buffering
+        # -> also for already received sequence numbers, as server re-transmits them if their ACK got lost
+        acked_sequence_number = (client["receiver_base"] - 1).to_bytes(1, byteorder=sys.byteorder)
+    else:
+        return
+    packet_trace.trace(packet_trace.EVENT_RECEIVE, client["address"][1], server_address, sequence_number,
+                       len(server_payload), trace_flags)
+
+    ack_payload = "ACK".encode()
+    ack_checksum = client["integrity_check"](acked_sequence_number + ack_payload).encode()
+    byte_ack_message = ack_checksum + ":".encode() + acked_sequence_number + ":".encode() + ack_payload
+
+    # try sending ACK via underlying (unreliable) network with loss profile of this particular client
+    was_acked = unreliable_network.prob_send(client_socket, byte_ack_message, server_address,
+                                             client["failure_probability"])
+    packet_trace.trace_send(was_acked, packet_trace.EVENT_ACK_SENT, client["address"][1], server_address,
+                            int.from_bytes(acked_sequence_number, byteorder=sys.byteorder), len(byte_ack_message))
+
+    # only in-order packets whose ACK actually left the client count towards receiving statistics
+    if was_acked and is_in_order:
+        if is_retransmission:
+            client["retransmitted_file_bytes_received"] += len(server_payload)
+            client["retransmitted_packets_received"] += 1
+        else:
+            client["file_bytes_received"] += len(server_payload)
+            client["packets_received"] += 1
+
+
+def run_client_swarm(file_name, clients_nr, min_failure_probability, max_failure_probability, pipeline_type,
+                     window_size, integrity_algorithm, discard_payloads, idle_timeout_s=60):
+    """
+    Runs a swarm of simulated Go-Back-N client processes inside a single process for load testing the server.
+    Every simulated client owns a UDP socket on a distinct port (assigned by the operating system) and its own loss
+    profile, all sockets being multiplexed by one selector instead of running one Python interpreter per client.
+
+    :param file_name: name of file to be downloaded from server
+    :param clients_nr: number of simulated clients (must match number of clients expected by server)
+    :param min_failure_probability: failure probability of first simulated client (float between 0 and 1)
+    :param max_failure_probability: failure probability of last simulated client, loss profiles of remaining clients
+                                    are evenly spread between both values
+    :param pipeline_type: pipelining mechanism for custom protocol over UDP (only Go-Back-N implemented so far)
+    :param window_size: size of sliding receiver window
+    :param integrity_algorithm: name of integrity check requested for packets and ACKs of session (see integrity.py)
+    :param discard_payloads: if True, received file data is only counted and not kept in memory
+    :param idle_timeout_s: seconds without any incoming datagram after which unfinished clients are given up
+    :return: 2-tuple (<list of client dictionaries with receiving statistics>, <monotonic session start timestamp>)
+    """
+
+    if pipeline_type != "gbn":
+        print(f"Pipelining mechanism '{pipeline_type}' is not supported by load generator, using Go-Back-N instead.")
+
+    # server address must be known beforehand (usually cannot be determined by the client !)
+    server_address = ("127.0.0.1", 2024)
+    integrity_check = integrity.get_integrity_check(integrity_algorithm)
+
+    # I/O multiplexing of all client sockets within a single thread of control
+    selector = selectors.DefaultSelector()
+    clients = list()
+
+    for client_nr in range(clients_nr):
+        # evenly spread loss profiles of simulated clients between minimum and maximum failure probability
+        if clients_nr > 1:
+            failure_probability = (min_failure_probability +
+                                   (max_failure_probability - min_failure_probability) * client_nr / (clients_nr - 1))
+        else:
+            failure_probability = min_failure_probability
+
+        # port 0 lets operating system pick an unused port -> no port collisions among simulated clients
+        client_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        client_socket.bind(("127.0.0.1", 0))
+        client_socket.setblocking(False)
+        # one process drains all sockets, so give each socket room for a burst of server datagrams (capped by kernel
+        # limit net.core.rmem_max), otherwise closing indicator may be lost in an overflowing receive buffer
+        client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1048576)
+
+        client = {
+            "address": client_socket.getsockname(),
+            "failure_probability": failure_probability,
+            "window_size": window_size,
+            "integrity_check": integrity_check,
+            "receiver_base": 0,
+            "requested_at": None,
+            "registered_at": None,
+            "first_packet_at": None,
+            "completed_at": None,
+            "rejected": False,
+            "file_bytes_received": 0,
+            "packets_received": 0,
+            "retransmitted_file_bytes_received": 0,
+            "retransmitted_packets_received": 0,
+            "file_data": None if discard_payloads else bytearray(),
+        }
+        clients.append(client)
+        selector.register(client_socket, selectors.EVENT_READ, client)
+
+    print(f"Swarm of {clients_nr} clients requesting {file_name} from server "
+          f"{server_address[0]}:{server_address[1]} ...")
+    print("")
+
+    # contacting server to request file download
+    download_request = f"Send {file_name} {integrity_algorithm}".encode()
+    session_start = time.monotonic()
+    for key in selector.get_map().values():
+        key.fileobj.sendto(download_request, server_address)
+        key.data["requested_at"] = time.monotonic()
+
+    # event loop for all simulated clients until every client completed its download or server went silent
+    unfinished_clients_nr = clients_nr
+    last_activity = time.monotonic()
+    # event loop can be interrupted via Ctrl+C (e.g. server overloaded), report then covers clients finished so far
+    try:
+        while unfinished_clients_nr > 0:
+            events = selector.select(timeout=1)
+
+            for key, _ in events:
+                client_socket = key.fileobj
+                client = key.data
+                # drain socket receive buffer, as several datagrams may be queued for the same client
+                while client["completed_at"] is None and not client["rejected"]:
+                    try:
+                        received_data, sender_address = client_socket.recvfrom(65535)
+                    except BlockingIOError:
+                        break
+                    last_activity = time.monotonic()
+                    receive_packet(client_socket, client, received_data, sender_address)
+
+                    if client["completed_at"] is not None or client["rejected"]:
+                        unfinished_clients_nr -= 1
+                        selector.unregister(client_socket)
+                        client_socket.close()
+
+            now = time.monotonic()
+            if now - last_activity > idle_timeout_s:
+                print(f"No data received for {idle_timeout_s}s, "
+                      f"giving up on {unfinished_clients_nr} unfinished clients.")
+                break
+
+            # download requests may be dropped by a saturated server socket -> repeat them until server answers
+            if not events:
+                for key in selector.get_map().values():
+                    if key.data["registered_at"] is None and now - key.data["requested_at"] >= 1:
+                        key.fileobj.sendto(download_request, server_address)
+                        key.data["requested_at"] = now
+    except KeyboardInterrupt:
+        print(f"Load test interrupted, {unfinished_clients_nr} clients unfinished.")
+
+    # release system resources of clients which did not finish their download
+    for key in list(selector.get_map().values()):
+        key.fileobj.close()
+    selector.close()
+
+    return clients, session_start
+
+
+def print_report(file_name, clients, session_start):
+    """
+    Prints per-client completion times and tail latency of a client swarm (see run_client_swarm function)
+
+    :param file_name: name of downloaded file (compared to received file data if payloads were kept)
+    :param clients: list of client dictionaries returned by run_client_swarm function
+    :param session_start: monotonic timestamp at which download requests were sent
+    :return: None
+    """
+
+    # local copy of file to check integrity of received file data
+    try:
+        with open(file_name, "rb") as download_file:
+            original_file_data = download_file.read()
+    except OSError:
+        original_file_data = None
+
+    print("")
+    print(f"--------------------------------------------------------------------------------------------")
+    print(f"{'client':>22} {'loss p':>7} {'completion':>11} {'packets':>8} {'retrans.':>8} {'intact':>7}")
+
+    completion_times = list()
+    total_bytes_received = 0
+    for client in clients:
+        if client["completed_at"] is not None:
+            # completion time measured from sending of download request until receipt of closing indicator
+            completion_time = client["completed_at"] - session_start
+            completion_times.append(completion_time)
+            completion_field = f"{completion_time:10.3f}s"
+        elif client["rejected"]:
+            completion_field = "rejected"
+        else:
+            completion_field = "unfinished"
+
+        if client["file_data"] is None or original_file_data is None:
+            intact_field = "-"
+        else:
+            intact_field = "yes" if client["file_data"] == original_file_data else "no"
+
+        total_bytes_received += client["file_bytes_received"] + client["retransmitted_file_bytes_received"]
+        client_field = f"{client['address'][0]}:{client['address'][1]}"
+        print(f"{client_field:>22} {client['failure_probability']:7.3f} {completion_field:>11} "
+              f"{client['packets_received']:8d} {client['retransmitted_packets_received']:8d} {intact_field:>7}")
+
+    completion_times.sort()
+    print(f"--------------------------------------------------------------------------------------------")
+    print(f"Completed downloads: {len(completion_times)}/{len(clients)}")
+    if completion_times:
+        session_duration = completion_times[-1]
+        print(f"Completion time min/mean: {completion_times[0]:.3f}s / "
+              f"{sum(completion_times) / len(completion_times):.3f}s")
+        print(f"Completion time p50/p90/p99/max: {percentile(completion_times, 0.5):.3f}s / "
+              f"{percentile(completion_times, 0.9):.3f}s / {percentile(completion_times, 0.99):.3f}s / "
+              f"{completion_times[-1]:.3f}s")
+        if session_duration > 0:
+            print(f"Aggregate goodput: {total_bytes_received / session_duration / 1000000:.3f} MB/s")
+    print(f"--------------------------------------------------------------------------------------------")
+
+
+# run load generator against a server process launched separately with the same number of expected clients, e.g.
+# python3 server_process.py 1 500 <file> 0.1 gbn 5 crc32
+# python3 load_generator.py <file> 500 0.0 0.2 gbn 5 discard crc32
+if __name__ == "__main__":
+    file_name = sys.argv[1]
+    clients_nr = int(sys.argv[2])
+    min_failure_probability = float(sys.argv[3])
+    max_failure_probability = float(sys.argv[4])
+    pipeline_type = sys.argv[5]
+    window_size = int(sys.argv[6])
+    # optional further arguments (any order):
+    # -> "discard": received file data is only counted, not kept in memory
+    # -> name of integrity check of session ("rfc1071" (default), "crc32" or "crc32c", see integrity.py)
+    discard_payloads = False
+    integrity_algorithm = integrity.DEFAULT_INTEGRITY_ALGORITHM
+    for optional_argument in sys.argv[7:]:
+        if optional_argument == "discard":
+            discard_payloads = True
+        else:
+            # unknown integrity check (e.g. typo) raises ValueError like in client_process.py (see integrity.py)
+            integrity.get_integrity_check(optional_argument)
+            integrity_algorithm = optional_argument
+
+    # optional per-packet tracing (enabled via PACKET_TRACE_DIR environment variable, see packet_trace.py)
+    packet_trace.start_tracing_from_environment("client")
+
+    swarm_clients, session_start = run_client_swarm(file_name, clients_nr, min_failure_probability,
+                                                    max_failure_probability, pipeline_type, window_size,
+                                                    integrity_algorithm, discard_payloads)
+    print_report(file_name, swarm_clients, session_start)
@@ -0,0 +1,225 @@
+# imported modules
+import hashlib              # C implementation of secure hash algorithms (here SHA-256)
+import json
+
+# maximum UDP payload over IPv4 is 65507 bytes (65535 - 8 bytes UDP header - 20 bytes IP header)
+MAX_DATAGRAM_SIZE = 65507
+
+
+def chunk_hash(chunk_data):
+    """
+    Function computing the SHA-256 leaf hash of a file data chunk. Leaves and inner nodes of the Merkle tree are
+    hashed with different prefix bytes, so that an inner node can never be passed off as a file data chunk.
+
+    :param chunk_data: bytestring of file data chunk
+    :return: 32-byte SHA-256 digest
+    """
+
+    return hashlib.sha256(b"\x00" + chunk_data).digest()
+
+
+def node_hash(left_hash, right_hash):
+    """
+    Function computing the SHA-256 hash of an inner Merkle tree node from the hashes of its two children
+
+    :param left_hash: 32-byte digest of left child node
+    :param right_hash: 32-byte digest of right child node
+    :return: 32-byte SHA-256 digest
+    """
+
+    return hashlib.sha256(b"\x01" + left_hash + right_hash).digest()
+
+
+def root_hash(tree_root, file_size, chunk_size, chunks_nr):
+    """
+    Function computing the Merkle root published in the file manifest, i.e. the SHA-256 hash of the tree root and the
+    file layout. As the last node of an odd level is paired with itself, trees over n and n + 1 chunks (last chunk
+    duplicated) share their tree root; committing to the number of chunks (and file and chunk size) removes this
+    ambiguity.
+
+    :param tree_root: 32-byte digest of root node of Merkle tree (see build_merkle_tree function)
+    :param file_size: size of file in bytes
+    :param chunk_size: size of file data chunks in bytes
+    :param chunks_nr: number of file data chunks
+    :return: 32-byte SHA-256 digest
+    """
+
+    return hashlib.sha256(b"\x02" + file_size.to_bytes(8, byteorder="big") + chunk_size.to_bytes(8, byteorder="big")
+                          + chunks_nr.to_bytes(8, byteorder="big") + tree_root).digest()
+
+
+def build_merkle_tree(data_chunks):
+    """
+    Function building a binary Merkle tree over all file data chunks. On levels with an odd number of nodes, the last
+    node is paired with itself, so that every chunk has an audit path of the same length (tree depth).
+
+    :param data_chunks: list of bytestrings (file data chunks, in order)
+    :return: list of tree levels (lists of 32-byte digests), from leaf level (index 0) up to root level (last index)
+    """
+
+    tree_levels = [[chunk_hash(chunk_data) for chunk_data in data_chunks]]
+
+    # empty files still get a well-defined root (hash of a single empty chunk)
+    if not tree_levels[0]:
+        tree_levels[0].append(chunk_hash(b""))
+
+    while len(tree_levels[-1]) > 1:
+        lower_level = tree_levels[-1]
+        upper_level = list()
+        for node_nr in range(0, len(lower_level), 2):
+            # last node of odd level is paired with itself
+            right_node_nr = min(node_nr + 1, len(lower_level) - 1)
+            upper_level.append(node_hash(lower_level[node_nr], lower_level[right_node_nr]))
+        tree_levels.append(upper_level)
+
+    return tree_levels
+
+
+def merkle_proof(tree_levels, chunk_nr):
+    """
+    Function collecting the audit path of a file data chunk, i.e. the sibling hashes needed to recompute the root
+
+    :param tree_levels: Merkle tree as returned by build_merkle_tree function
+    :param chunk_nr: index of file data chunk
+    :return: bytestring of concatenated 32-byte sibling digests, from leaf level upwards
+    """
+
+    proof = b""
+    node_nr = chunk_nr
+    for tree_level in tree_levels[:-1]:
+        # sibling of even node is right neighbour (or node itself at end of odd level), sibling of odd node left one
+        sibling_nr = node_nr + 1 if node_nr % 2 == 0 else node_nr - 1
+        proof += tree_level[min(sibling_nr, len(tree_level) - 1)]
+        node_nr //= 2
+
+    return proof
+
+
+def verify_chunk(chunk_data, chunk_nr, proof, file_manifest):
+    """
+    Function checking a received file data chunk against the Merkle root published in the file manifest
+
+    :param chunk_data: bytestring of received file data chunk
+    :param chunk_nr: index of file data chunk
+    :param proof: bytestring of concatenated 32-byte sibling digests (see merkle_proof function)
+    :param file_manifest: manifest dictionary of file (see build_manifest function)
+    :return: True if chunk is authentic, False otherwise
+    """
+
+    # chunk must exist in file layout of manifest and have the expected size (only last chunk may be smaller)
+    chunk_size = file_manifest["chunk_size"]
+    expected_size = min(chunk_size, file_manifest["file_size"] - chunk_nr * chunk_size)
+    if not 0 <= chunk_nr < file_manifest["chunks_nr"] or len(chunk_data) != expected_size:
+        return False
+    if len(proof) != 32 * file_manifest["proof_length"]:
+        return False
+
+    current_hash = chunk_hash(chunk_data)
+    node_nr = chunk_nr
+    for sibling_start in range(0, len(proof), 32):
+        sibling_hash = proof[sibling_start:sibling_start + 32]
+        if node_nr % 2 == 0:
+            current_hash = node_hash(current_hash, sibling_hash)
+        else:
+            current_hash = node_hash(sibling_hash, current_hash)
+        node_nr //= 2
+
+    return (root_hash(current_hash, file_manifest["file_size"], chunk_size, file_manifest["chunks_nr"])
+            == bytes.fromhex(file_manifest["merkle_root"]))
+
+
+def build_manifest(file_name, file_data, chunk_size):
+    """
+    Function chunking file data and building the manifest published by a server to registering clients
+
+    :param file_name: name of file described by manifest
+    :param file_data: bytestring of complete file content
+    :param chunk_size: size of file data chunks in bytes (last chunk may be smaller)
+    :return: 3-tuple (<manifest dictionary>, <list of file data chunks>, <Merkle tree levels>)
+    """
+
+    data_chunks = [file_data[byte:byte + chunk_size] for byte in range(0, len(file_data), chunk_size)]
+    tree_levels = build_merkle_tree(data_chunks)
+
+    manifest = {
+        "file_name": file_name,
+        "file_size": len(file_data),
+        "chunk_size": chunk_size,
+        "chunks_nr": len(data_chunks),
+        "merkle_root": root_hash(tree_levels[-1][0], len(file_data), chunk_size, len(data_chunks)).hex(),
+        # number of 32-byte sibling digests accompanying each chunk
+        "proof_length": len(tree_levels) - 1,
+    }
+
+    return manifest, data_chunks, tree_levels
+
+
+def is_consistent_manifest(manifest):
+    """
+    Function checking that the fields of a received manifest agree with each other, so that a hostile or corrupt
+    manifest cannot make clients allocate arbitrary amounts of memory or disk space for a file layout which no Merkle
+    tree matches
+
+    :param manifest: manifest dictionary
+    :return: True if manifest is consistent, False otherwise
+    """
+
+    # sizes must be (non-boolean) integers
+    size_fields = ("file_size", "chunk_size", "chunks_nr", "proof_length")
+    if any(type(manifest[field]) is not int for field in size_fields):
+        return False
+
+    file_size = manifest["file_size"]
+    chunk_size = manifest["chunk_size"]
+    chunks_nr = manifest["chunks_nr"]
+    if file_size < 0 or chunk_size <= 0:
+        return False
+
+    # chunk with its audit path and "Chunk:<chunk number>:" header must fit into a single datagram
+    if chunk_size + 32 * manifest["proof_length"] + 32 > MAX_DATAGRAM_SIZE:
+        return False
+
+    # number of chunks follows from file and chunk size, audit path length from number of leaves (tree depth)
+    if chunks_nr != -(-file_size // chunk_size) or manifest["proof_length"] != (max(chunks_nr, 1) - 1).bit_length():
+        return False
+
+    try:
+        return len(bytes.fromhex(manifest["merkle_root"])) == 32
+    except (TypeError, ValueError):
+        return False
+
+
+def encode_manifest(manifest):
+    """
+    Function serialising a file manifest into a UDP message ("Manifest:<JSON document>")
+
+    :param manifest: manifest dictionary (see build_manifest function)
+    :return: bytestring message
+    """
+
+    return "Manifest:".encode() + json.dumps(manifest, sort_keys=True).encode()
+
+
+def decode_manifest(byte_message):
+    """
+    Function parsing a UDP manifest message (see encode_manifest function)
+
+    :param byte_message: bytestring received from server
+    :return: manifest dictionary, None if message is no (valid) manifest
+    """
+
+    if not byte_message.startswith(b"Manifest:"):
+        return None
+
+    try:
+        manifest = json.loads(byte_message[len(b"Manifest:"):].decode())
+    except ValueError:
+        return None
+
+    required_fields = ("file_name", "file_size", "chunk_size", "chunks_nr", "merkle_root", "proof_length")
+    if not isinstance(manifest, dict) or any(field not in manifest for field in required_fields):
+        return None
+    if not is_consistent_manifest(manifest):
+        return None
+
+    return manifest
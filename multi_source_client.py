@@ -0,0 +1,420 @@
+# imported modules
+import socket               # Python implementation of Berkeley Software Distribution (BSD) socket interface
+import sys
+import time
+import manifest
+import unreliable_network
+
+# number of chunks failing Merkle verification after which a source server is no longer trusted
+MAX_VERIFICATION_FAILURES = 3
+
+
+def request_manifests(client_socket, file_name, source_addresses, failure_probability, timeout_s=5):
+    """
+    Registers client at all source servers and collects the manifest each of them publishes (see source_server.py)
+
+    :param client_socket: socket of client process
+    :param file_name: name of file to be downloaded
+    :param source_addresses: list of 2-tuples (<host>, <port>) of source servers
+    :param failure_probability: probability of unsuccessful data transmission over UDP (float between 0 and 1)
+    :param timeout_s: seconds after which sources that did not publish a manifest are given up
+    :return: dictionary mapping addresses of answering source servers to their manifest
+    """
+
+    download_request = f"Send {file_name}".encode()
+    source_manifests = dict()
+    deadline = time.monotonic() + timeout_s
+
+    while len(source_manifests) < len(source_addresses) and time.monotonic() < deadline:
+        # (re-)send download request to every source server which did not answer yet (request or manifest may be lost)
+        for source_address in source_addresses:
+            if source_address not in source_manifests:
+                unreliable_network.prob_send(client_socket, download_request, source_address, failure_probability)
+
+        client_socket.settimeout(0.5)
+        try:
+            while len(source_manifests) < len(source_addresses):
+                received_data, source_address = client_socket.recvfrom(65535)
+                source_manifest = manifest.decode_manifest(received_data)
+                if source_manifest is not None and source_address in source_addresses:
+                    source_manifests[source_address] = source_manifest
+        except socket.timeout:
+            pass
+
+    return source_manifests
+
+
+def select_manifest(source_manifests, trusted_root=None):
+    """
+    Chooses the manifest the download is based on. With a trusted Merkle root (e.g. obtained from the publisher of the
+    file beforehand), only a manifest with this root is accepted. Otherwise, a strict majority of answering source
+    servers must publish the same manifest, so that a single wrong or malicious source cannot exclude honest ones.
+
+    :param source_manifests: dictionary mapping addresses of answering source servers to their manifest
+    :param trusted_root: Merkle root of file as hexadecimal string, None to decide by majority of source servers
+    :return: agreed manifest dictionary, None if no manifest qualifies
+    """
+
+    for source_manifest in source_manifests.values():
+        if trusted_root is not None:
+            if source_manifest["merkle_root"] == trusted_root.lower():
+                return source_manifest
+        elif 2 * list(source_manifests.values()).count(source_manifest) > len(source_manifests):
+            return source_manifest
+
+    return None
+
+
+def delivery_rate(source, elapsed_s):
+    """
+    Helper function measuring the delivery rate of a source server since start of download
+
+    :param source: dictionary holding state of source server (see run_multi_source_client function)
+    :param elapsed_s: seconds since start of download
+    :return: verified chunks per second (source without verified chunk yet is rated as one chunk in elapsed time)
+    """
+
+    return max(source["chunks_received"], 1) / max(elapsed_s, 0.001)
+
+
+def estimated_remaining_s(source, elapsed_s):
+    """
+    Helper function estimating how long a source server needs for its assigned (pending and in-flight) chunks
+
+    :param source: dictionary holding state of source server (see run_multi_source_client function)
+    :param elapsed_s: seconds since start of download
+    :return: estimated remaining time in seconds
+    """
+
+    assigned_chunks_nr = len(source["pending"]) + len(source["in_flight"])
+    return assigned_chunks_nr / delivery_rate(source, elapsed_s)
+
+
+def rebalance(idle_source, sources, chunk_received, elapsed_s):
+    """
+    Lets a source server without pending chunks take over pending chunks of the OTHER source server with the longest
+    estimated remaining time. Pending chunks are split in proportion to the delivery rates of both sources, taken from
+    the back of the pending list, so that chunk ranges of both sources stay disjoint. Once no source has pending chunks
+    left (endgame), the idle source additionally requests the chunks still in flight at the slowest other source, the
+    copy arriving later is ignored.
+
+    :param idle_source: dictionary holding state of source server without pending chunks
+    :param sources: dictionary mapping addresses of all agreeing source servers to their state
+    :param chunk_received: list of flags indicating which chunks were already verified and written
+    :param elapsed_s: seconds since start of download
+    :return: None
+    """
+
+    busy_sources = [source for source in sources.values() if source is not idle_source and source["pending"]]
+    if not busy_sources:
+        # endgame: duplicate requests for chunks in flight elsewhere (not yet received or requested by idle source)
+        loaded_sources = [source for source in sources.values() if source is not idle_source and source["in_flight"]]
+        if loaded_sources:
+            slowest_source = max(loaded_sources, key=lambda source: estimated_remaining_s(source, elapsed_s))
+            duplicated_chunks = [chunk_nr for chunk_nr in slowest_source["in_flight"]
+                                 if not chunk_received[chunk_nr] and chunk_nr not in idle_source["in_flight"]]
+            idle_source["pending"] = duplicated_chunks
+            idle_source["duplicated"].update(duplicated_chunks)
+        return
+
+    slowest_source = max(busy_sources, key=lambda source: estimated_remaining_s(source, elapsed_s))
+    idle_rate = delivery_rate(idle_source, elapsed_s)
+    slowest_rate = delivery_rate(slowest_source, elapsed_s)
+    stolen_chunks_nr = max(1, round(len(slowest_source["pending"]) * idle_rate / (idle_rate + slowest_rate)))
+
+    idle_source["pending"] = slowest_source["pending"][-stolen_chunks_nr:]
+    del slowest_source["pending"][-stolen_chunks_nr:]
+    idle_source["taken_over"].update(idle_source["pending"])
+
+
+def refill_window(client_socket, file_name, source_address, source, sources, chunk_received, failure_probability,
+                  elapsed_s):
+    """
+    Fills request window of a source server with a batch request of its pending chunks (rebalancing work to it first
+    if it has no pending chunks left)
+
+    :param client_socket: socket of client process
+    :param file_name: name of file to be downloaded
+    :param source_address: 2-tuple (<host>, <port>) of source server
+    :param source: dictionary holding state of source server
+    :param sources: dictionary mapping addresses of all agreeing source servers to their state
+    :param chunk_received: list of flags indicating which chunks were already verified and written
+    :param failure_probability: probability of unsuccessful data transmission over UDP (float between 0 and 1)
+    :param elapsed_s: seconds since start of download
+    :return: None
+    """
+
+    if not source["pending"]:
+        rebalance(source, sources, chunk_received, elapsed_s)
+
+    requested_chunks = list()
+    now = time.monotonic()
+    while source["pending"] and len(source["in_flight"]) < source["window_size"]:
+        chunk_nr = source["pending"].pop(0)
+        if not chunk_received[chunk_nr]:
+            source["in_flight"][chunk_nr] = now
+            requested_chunks.append(str(chunk_nr))
+
+    if requested_chunks:
+        chunk_request = f"Get {file_name} {' '.join(requested_chunks)}".encode()
+        unreliable_network.prob_send(client_socket, chunk_request, source_address, failure_probability)
+
+
+def requeue_elsewhere(chunk_numbers, excluded_source, sources, elapsed_s):
+    """
+    Hands chunks over to the agreeing source server (other than the excluded one) expected to finish first. Only if
+    no other source server is left, chunks are handed back to the excluded one (e.g. transient corruption).
+
+    :param chunk_numbers: list of chunk numbers to be requested again
+    :param excluded_source: dictionary holding state of source server which must not get the chunks
+    :param sources: dictionary mapping addresses of all agreeing source servers to their state
+    :param elapsed_s: seconds since start of download
+    :return: None
+    """
+
+    other_sources = [source for source in sources.values() if source is not excluded_source]
+    if not other_sources:
+        other_sources = list(sources.values())
+    if not other_sources or not chunk_numbers:
+        return
+
+    fastest_source = min(other_sources, key=lambda source: estimated_remaining_s(source, elapsed_s))
+    fastest_source["pending"][0:0] = chunk_numbers
+
+
+def run_multi_source_client(file_name, output_file_name, source_addresses, failure_probability, window_size,
+                            trusted_root=None, idle_timeout_s=30):
+    """
+    Runs client process downloading disjoint chunk ranges of a file from several source servers in parallel. Every
+    chunk is verified against the Merkle root of the file manifest before being written, and pending chunks of slow
+    sources are rebalanced to sources that ran out of work.
+
+    :param file_name: name of file to be downloaded from source servers
+    :param output_file_name: name of file into which verified chunks are written
+    :param source_addresses: list of 2-tuples (<host>, <port>) of source servers serving the file
+    :param failure_probability: probability of unsuccessful data transmission over UDP (float between 0 and 1)
+    :param window_size: maximum number of chunks requested but not yet received per source server
+    :param trusted_root: Merkle root of file as hexadecimal string, None to agree on manifest by majority of sources
+    :param idle_timeout_s: seconds without a verified chunk after which download is aborted
+    :return: True if the complete file was downloaded and verified, False otherwise
+    """
+
+    # for security & demonstration reasons, client address is IPv4 loopback address (inaccessible to outer networks)
+    # port 0 lets operating system pick an unused port (no collisions with other clients)
+    client_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client_socket.bind(("127.0.0.1", 0))
+    client_ip, client_port = client_socket.getsockname()
+
+    print(f"Client {client_ip}:{client_port} requesting {file_name} from {len(source_addresses)} source servers...")
+    print("")
+
+    #############################################################################################################
+    # manifest agreement: only sources publishing the trusted or majority manifest (see select_manifest) are used
+    #############################################################################################################
+
+    source_manifests = request_manifests(client_socket, file_name, source_addresses, failure_probability)
+    if not source_manifests:
+        print(f"No source server published a manifest of '{file_name}'. Download aborted.")
+        client_socket.close()
+        return False
+
+    file_manifest = select_manifest(source_manifests, trusted_root)
+    if file_manifest is None:
+        if trusted_root is None:
+            print(f"No majority of {len(source_manifests)} answering source servers agrees on a manifest of "
+                  f"'{file_name}' (pass its Merkle root to decide). Download aborted.")
+        else:
+            print(f"No source server publishes a manifest of '{file_name}' with Merkle root {trusted_root}. "
+                  f"Download aborted.")
+        client_socket.close()
+        return False
+    chunks_nr = file_manifest["chunks_nr"]
+    chunk_size = file_manifest["chunk_size"]
+    proof_length = 32 * file_manifest["proof_length"]
+
+    sources = dict()
+    for source_address, source_manifest in source_manifests.items():
+        if source_manifest != file_manifest:
+            print(f"Source server {source_address[0]}:{source_address[1]} publishes a different manifest, ignored.")
+            continue
+        sources[source_address] = {
+            "pending": list(),              # chunk numbers assigned to source, but not yet requested
+            "in_flight": dict(),            # chunk number -> time of request
+            "window_size": window_size,
+            "srtt": None,                   # smoothed round trip time of chunk requests (seconds, None until measured)
+            "chunks_received": 0,
+            "bytes_received": 0,
+            "timeouts": 0,
+            "verification_failures": 0,
+            "taken_over": set(),            # chunk numbers taken over from pending chunks of slower sources
+            "duplicated": set(),            # chunk numbers requested in endgame while in flight at slower sources
+            "chunks_stolen": 0,             # taken-over chunks actually delivered by source
+            "chunks_duplicated": 0,         # endgame duplicates delivered by source before the slower source
+        }
+
+    # split chunk numbers into disjoint, contiguous ranges (one per source server)
+    source_list = list(sources.values())
+    if not source_list:
+        print(f"No source server agrees on manifest of '{file_name}'. Download aborted.")
+        client_socket.close()
+        return False
+    for source_nr, source in enumerate(source_list):
+        range_start = chunks_nr * source_nr // len(source_list)
+        range_end = chunks_nr * (source_nr + 1) // len(source_list)
+        source["pending"] = list(range(range_start, range_end))
+
+    print(f"Manifest agreed with {len(sources)} source servers: {file_manifest['file_size']} bytes in "
+          f"{chunks_nr} chunks of {chunk_size} bytes (Merkle root {file_manifest['merkle_root']}).")
+    print("")
+
+    #############################################################################################################
+    # parallel chunk download loop
+    #############################################################################################################
+
+    # sources dropped for corrupting chunks (kept for final statistics)
+    dropped_sources = dict()
+
+    chunk_received = [False] * chunks_nr
+    chunks_received_nr = 0
+    download_start = time.monotonic()
+    last_progress = download_start
+
+    # room for full request windows of all sources (default receive buffer overflows with large chunks)
+    client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4194304)
+    # short timeout, so that lost chunks are detected even if no source sends anything
+    client_socket.settimeout(0.01)
+
+    # preallocate output file, so that verified chunks can be written at their offset in any order
+    with open(output_file_name, "wb") as output_file:
+        output_file.truncate(file_manifest["file_size"])
+
+        # one received datagram per iteration, i.e. timeouts, rebalancing and request windows are handled right away
+        while chunks_received_nr < chunks_nr:
+            now = time.monotonic()
+            if now - last_progress > idle_timeout_s:
+                print(f"No verified chunk received for {idle_timeout_s}s. Download aborted.")
+                break
+            if not sources:
+                print("No trustworthy source server left. Download aborted.")
+                break
+
+            for source_address, source in sources.items():
+                # re-queue timed-out chunk requests (request or chunk lost) in front of pending chunks of source
+                retransmission_timeout = 1.0 if source["srtt"] is None else min(max(0.2, 4 * source["srtt"]), 5.0)
+                for chunk_nr, requested_at in list(source["in_flight"].items()):
+                    if now - requested_at > retransmission_timeout:
+                        del source["in_flight"][chunk_nr]
+                        if not chunk_received[chunk_nr]:
+                            source["pending"].insert(0, chunk_nr)
+                            source["timeouts"] += 1
+
+                refill_window(client_socket, file_name, source_address, source, sources, chunk_received,
+                              failure_probability, now - download_start)
+
+            try:
+                received_data, source_address = client_socket.recvfrom(65535)
+            except socket.timeout:
+                continue
+
+            if source_address not in sources or not received_data.startswith(b"Chunk:"):
+                continue
+
+            # packet layout: "Chunk:<chunk number>:" + audit path (proof_length bytes) + chunk data
+            chunk_nr_end = received_data.find(b":", 6)
+            if chunk_nr_end < 0 or not received_data[6:chunk_nr_end].isdigit():
+                continue
+            chunk_nr = int(received_data[6:chunk_nr_end])
+            proof = received_data[chunk_nr_end + 1:chunk_nr_end + 1 + proof_length]
+            chunk_data = received_data[chunk_nr_end + 1 + proof_length:]
+
+            source = sources[source_address]
+            requested_at = source["in_flight"].pop(chunk_nr, None)
+            if chunk_nr >= chunks_nr or chunk_received[chunk_nr]:
+                continue
+
+            # verify chunk against manifest before writing it (protects against corrupt or lying sources)
+            if not manifest.verify_chunk(chunk_data, chunk_nr, proof, file_manifest):
+                source["verification_failures"] += 1
+                print(f"Chunk {chunk_nr} from source server {source_address[0]}:{source_address[1]} "
+                      f"failed verification, requesting it from another source.")
+
+                # never ask the same source again for a chunk it corrupted
+                requeue_elsewhere([chunk_nr], source, sources, time.monotonic() - download_start)
+
+                # source corrupting chunks repeatedly is dropped, its remaining chunks are handed to other sources
+                if source["verification_failures"] >= MAX_VERIFICATION_FAILURES:
+                    print(f"Source server {source_address[0]}:{source_address[1]} dropped after "
+                          f"{source['verification_failures']} verification failures.")
+                    del sources[source_address]
+                    dropped_sources[source_address] = source
+                    requeue_elsewhere(source["pending"] + [chunk for chunk in source["in_flight"]
+                                                           if not chunk_received[chunk]],
+                                      source, sources, time.monotonic() - download_start)
+                continue
+
+            output_file.seek(chunk_nr * chunk_size)
+            output_file.write(chunk_data)
+            chunk_received[chunk_nr] = True
+            chunks_received_nr += 1
+            last_progress = time.monotonic()
+
+            # update receiving statistics and smoothed round trip time (exponentially weighted moving average)
+            source["chunks_received"] += 1
+            source["bytes_received"] += len(chunk_data)
+            if chunk_nr in source["taken_over"]:
+                source["chunks_stolen"] += 1
+            elif chunk_nr in source["duplicated"]:
+                source["chunks_duplicated"] += 1
+            if requested_at is not None:
+                if source["srtt"] is None:
+                    source["srtt"] = last_progress - requested_at
+                else:
+                    source["srtt"] = 0.875 * source["srtt"] + 0.125 * (last_progress - requested_at)
+
+            # refill request window of delivering source immediately (rebalancing work to it if it ran out of work)
+            refill_window(client_socket, file_name, source_address, source, sources, chunk_received,
+                          failure_probability, last_progress - download_start)
+
+    # release system resources by closing socket after file transmission completed and communicate statistics
+    client_socket.close()
+    download_duration = time.monotonic() - download_start
+    download_complete = chunks_received_nr == chunks_nr
+
+    print("")
+    print(f"--------------------------------------------------------------------------------------------")
+    print(f"--------------------------------------------------------------------------------------------")
+    if download_complete:
+        print(f"File '{file_name}' has been downloaded and verified by client at {client_ip}:{client_port} "
+              f"in {download_duration:.3f}s (written to '{output_file_name}').")
+    else:
+        print(f"Download of file '{file_name}' incomplete: {chunks_received_nr}/{chunks_nr} chunks verified.")
+    print("")
+    for source_address, source in list(sources.items()) + list(dropped_sources.items()):
+        srtt_field = "n/a" if source["srtt"] is None else f"{source['srtt'] * 1000:.1f}ms"
+        print(f"Source server {source_address[0]}:{source_address[1]}"
+              f"{' (dropped)' if source_address in dropped_sources else ''}: {source['chunks_received']} chunks "
+              f"({source['bytes_received']} bytes), {source['timeouts']} timeouts, "
+              f"{source['verification_failures']} verification failures, {source['chunks_stolen']} chunks taken over, "
+              f"{source['chunks_duplicated']} endgame duplicates won, smoothed RTT {srtt_field}")
+    print(f"--------------------------------------------------------------------------------------------")
+    print(f"--------------------------------------------------------------------------------------------")
+
+    return download_complete
+
+
+# run multi-source client script, e.g. python3 multi_source_client.py <file> <output file> 0.1 8 2025 2026 2027
+# (optionally followed by root=<Merkle root> as printed by source_server.py, otherwise majority of sources decides)
+if __name__ == "__main__":
+    file_name = sys.argv[1]
+    output_file_name = sys.argv[2]
+    failure_probability = float(sys.argv[3])
+    window_size = int(sys.argv[4])
+    # source servers are identified by their ports on the IPv4 loopback address
+    source_addresses = [("127.0.0.1", int(port)) for port in sys.argv[5:] if not port.startswith("root=")]
+    trusted_root = None
+    for optional_argument in sys.argv[5:]:
+        if optional_argument.startswith("root="):
+            trusted_root = optional_argument[len("root="):]
+
+    run_multi_source_client(file_name, output_file_name, source_addresses, failure_probability, window_size,
+                            trusted_root)
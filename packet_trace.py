@@ -0,0 +1,175 @@
+# imported modules
+import atexit
+import itertools
+import mmap                 # memory-mapped file objects (records are written to page cache, no system call per record)
+import os
+import socket
+import struct               # conversion between Python values and C structs represented as bytestrings
+import time
+
+# per-packet events recorded by tracer
+EVENT_SEND = 1                  # file data packet sent by server
+EVENT_RETRANSMIT = 2            # file data packet re-transmitted by server after timeout
+EVENT_DROP = 3                  # packet dropped by simulated network unreliability (see unreliable_network.prob_send)
+EVENT_RECEIVE = 4               # file data packet received by client with valid checksum
+EVENT_CHECKSUM_FAILURE = 5      # packet received with invalid checksum (client or server side)
+EVENT_ACK_SENT = 6              # ACK message sent by client
+EVENT_ACK_RECEIVED = 7          # ACK message received by server with valid checksum
+
+EVENT_NAMES = {EVENT_SEND: "send", EVENT_RETRANSMIT: "retransmit", EVENT_DROP: "drop", EVENT_RECEIVE: "receive",
+               EVENT_CHECKSUM_FAILURE: "checksum_failure", EVENT_ACK_SENT: "ack_sent",
+               EVENT_ACK_RECEIVED: "ack_received"}
+
+# flags of packet events
+FLAG_RETRANSMISSION = 1         # packet is (marked as) a re-transmission
+FLAG_IN_ORDER = 2               # received packet carried next in-order sequence number (new file data for client)
+
+# binary layout of trace file (little-endian, fixed size records in a ring buffer following the file header):
+# -> header: magic, role of traced process, record size, ring capacity (records), total number of written records
+# -> record: timestamp (ns, monotonic clock shared by all processes of host), event, flags, local port, peer port,
+#            peer IPv4 address, sequence number (-1 if unknown), packet size in bytes, padding to 32 bytes
+HEADER_FORMAT = struct.Struct("<8s8sIIQ")
+RECORD_FORMAT = struct.Struct("<QBBHHIiI6x")
+TRACE_MAGIC = b"PKTTRACE"
+
+# state of tracer of current process (tracing disabled as long as _trace_map is None)
+_trace_map = None
+_trace_capacity = 0
+_record_counter = itertools.count()     # next() on itertools.count is atomic under GIL (retransmission timer threads)
+_packed_addresses = dict()              # cache of IPv4 addresses converted to integers
+
+
+def start_tracing(trace_file_name, role, capacity=1048576):
+    """
+    Enables tracing of packet events of current process into a memory-mapped ring file of fixed size. Once the ring is
+    full, oldest records are overwritten.
+
+    :param trace_file_name: name of trace file (created or overwritten)
+    :param role: role of traced process (e.g. "server" or "client", at most 8 characters)
+    :param capacity: number of records the ring file can hold (32 bytes per record)
+    :return: None
+    """
+
+    global _trace_map, _trace_capacity, _record_counter
+
+    stop_tracing()
+
+    # allocate trace file of fixed size (header + ring of records), unwritten records are zero-filled
+    with open(trace_file_name, "w+b") as trace_file:
+        trace_file.truncate(HEADER_FORMAT.size + capacity * RECORD_FORMAT.size)
+        _trace_map = mmap.mmap(trace_file.fileno(), 0)
+
+    HEADER_FORMAT.pack_into(_trace_map, 0, TRACE_MAGIC, role.encode()[:8], RECORD_FORMAT.size, capacity, 0)
+    _trace_capacity = capacity
+    _record_counter = itertools.count()
+
+    # records are flushed and total record count is written when process terminates
+    atexit.register(stop_tracing)
+
+
+def start_tracing_from_environment(role):
+    """
+    Enables tracing if environment variable PACKET_TRACE_DIR names a directory. Every traced process writes its own
+    trace file <role>_<process id>.trace into that directory, so that trace_analyzer.py can merge them afterwards.
+
+    :param role: role of traced process (e.g. "server" or "client")
+    :return: None
+    """
+
+    trace_directory = os.environ.get("PACKET_TRACE_DIR")
+    if trace_directory:
+        start_tracing(os.path.join(trace_directory, f"{role}_{os.getpid()}.trace"), role)
+
+
+def stop_tracing():
+    """
+    Disables tracing, writes total number of records into trace file header and releases memory-mapped trace file
+
+    :return: None
+    """
+
+    global _trace_map
+
+    if _trace_map is None:
+        return
+
+    trace_map = _trace_map
+    _trace_map = None
+
+    # itertools.count cannot be read without advancing, i.e. next value equals number of records written so far
+    records_written = next(_record_counter)
+    struct.pack_into("<Q", trace_map, HEADER_FORMAT.size - 8, records_written)
+    trace_map.flush()
+    trace_map.close()
+
+
+def trace(event, local_port, peer_address, sqn_nr, packet_size, flags=0):
+    """
+    Records a packet event if tracing is enabled (cheap no-op otherwise)
+
+    :param event: event type (one of the EVENT_* constants)
+    :param local_port: port of socket of traced process
+    :param peer_address: 2-tuple (<IPv4 address>, <port>) of remote socket
+    :param sqn_nr: sequence number of packet (-1 if unknown)
+    :param packet_size: size of packet (or payload) in bytes
+    :param flags: combination of FLAG_* constants
+    :return: None
+    """
+
+    trace_map = _trace_map
+    if trace_map is None:
+        return
+
+    packed_address = _packed_addresses.get(peer_address[0])
+    if packed_address is None:
+        packed_address = int.from_bytes(socket.inet_aton(peer_address[0]), byteorder="big")
+        _packed_addresses[peer_address[0]] = packed_address
+
+    record_slot = next(_record_counter) % _trace_capacity
+    RECORD_FORMAT.pack_into(trace_map, HEADER_FORMAT.size + record_slot * RECORD_FORMAT.size,
+                            time.monotonic_ns(), event, flags, local_port, peer_address[1], packed_address,
+                            sqn_nr, packet_size)
+
+
+def trace_send(was_sent, event, local_port, peer_address, sqn_nr, packet_size, flags=0):
+    """
+    Records outcome of unreliable_network.prob_send(), i.e. the given event if packet was sent and a drop otherwise
+
+    :param was_sent: return value of unreliable_network.prob_send()
+    :param event: event type recorded if packet was sent (e.g. EVENT_SEND or EVENT_ACK_SENT)
+    :return: None (remaining parameters see trace function)
+    """
+
+    trace(event if was_sent else EVENT_DROP, local_port, peer_address, sqn_nr, packet_size, flags)
+
+
+def read_trace(trace_file_name):
+    """
+    Reads all records of a trace file written by this module
+
+    :param trace_file_name: name of trace file
+    :return: 3-tuple (<role of traced process>, <total number of records written (0 if process crashed)>,
+             <list of records as 8-tuples (timestamp, event, flags, local port, (peer IPv4 address, peer port),
+             sequence number, packet size, role) ordered by timestamp>)
+    """
+
+    with open(trace_file_name, "rb") as trace_file:
+        trace_data = trace_file.read()
+
+    magic, role, record_size, capacity, records_written = HEADER_FORMAT.unpack_from(trace_data, 0)
+    if magic != TRACE_MAGIC or record_size != RECORD_FORMAT.size:
+        raise ValueError(f"'{trace_file_name}' is no packet trace file.")
+    role = role.rstrip(b"\x00").decode()
+
+    records = list()
+    for timestamp, event, flags, local_port, peer_port, packed_address, sqn_nr, packet_size in \
+            RECORD_FORMAT.iter_unpack(trace_data[HEADER_FORMAT.size:HEADER_FORMAT.size + capacity * record_size]):
+        # zero timestamp marks unused slot of ring
+        if timestamp == 0:
+            continue
+        peer_address = (socket.inet_ntoa(packed_address.to_bytes(4, byteorder="big")), peer_port)
+        records.append((timestamp, event, flags, local_port, peer_address, sqn_nr, packet_size, role))
+
+    # ring may have wrapped around, restore chronological order
+    records.sort(key=lambda record: record[0])
+    return role, records_written, records
@@ -2,15 +2,19 @@
 import socket               # Python implementation of Berkeley Software Distribution (BSD) socket interface
 import sys
 import threading            # module for thread-based parallelism (NO true concurrency due to Global Interpreter Lock)
+import integrity
+import packet_trace
 import unreliable_network
 
 
-def retransmission_handler_gbn(server_socket, failure_probability, registered_client, last_ack_rcvd_from_client,
-                                data_chunks, sqn_nr, window_end, file_bytes_retransmitted, packets_retransmitted):
+def retransmission_handler_gbn(server_socket, failure_probability, integrity_check, registered_client,
+                               last_ack_rcvd_from_client, data_chunks, sqn_nr, window_end, file_bytes_retransmitted,
+                               packets_retransmitted):
     """
     Handler function for Go-Back-N retransmission of timed-out packets (see also run_server function)
 
     :param server_socket: socket of Go-Back-N server (protocol sender side)
+    :param integrity_check: integrity check function agreed for session (see integrity.py)
     :param registered_client: client to which timed-out packet was addressed
     :param last_ack_rcvd_from_client: highest, in-order (!) sequence number acknowledged by respective client process
     :param sqn_nr: sequence number of timed-out packet (corrupted, lost or extensively delayed)
@@ -24,11 +28,12 @@ def retransmission_handler_gbn(server_socket, failure_probability, registered_cl
 
     # if client-specific timer for packet n expires, retransmit all packets from sequence number n to current window end
     else:
+        server_port = server_socket.getsockname()[1]
         for packet_nr in range(sqn_nr, window_end + 1):
             # packet construction
             # -> package payload with checksum and sequence number metadata (pseudo-headers)
             encoded_sqn_nr = packet_nr.to_bytes(1, byteorder=sys.byteorder)
-            sender_checksum = unreliable_network.checksum(encoded_sqn_nr + data_chunks[packet_nr]).encode()
+            sender_checksum = integrity_check(encoded_sqn_nr + data_chunks[packet_nr]).encode()
             # -> indicate in sequence number field that it is a re-transmitted packet by appending ",R"
             byte_message = (sender_checksum + ":".encode() +
                             encoded_sqn_nr + ",R:".encode()
@@ -36,6 +41,8 @@ def retransmission_handler_gbn(server_socket, failure_probability, registered_cl
 
             # try resending prepared packet via underlying (unreliable) network to client
             was_sent = unreliable_network.prob_send(server_socket, byte_message, registered_client, failure_probability)
+            packet_trace.trace_send(was_sent, packet_trace.EVENT_RETRANSMIT, server_port, registered_client, packet_nr,
+                                    len(data_chunks[packet_nr]), packet_trace.FLAG_RETRANSMISSION)
 
             # if packet retransmission was successful, update sending statistics
             if was_sent:
@@ -48,7 +55,7 @@ def retransmission_handler_gbn(server_socket, failure_probability, registered_cl
 
 
 def run_server(process_id, expected_clients_nr, file_name, failure_probability, pipeline_type, window_size,
-               file_bytes_sent, packets_sent, file_bytes_retransmitted, packets_retransmitted):
+               integrity_algorithm, file_bytes_sent, packets_sent, file_bytes_retransmitted, packets_retransmitted):
     """
     Runs server process for synchronously transmitting a file to multiple client processes with simulated network
     unreliability and using the specified pipelining mechanism
@@ -59,9 +66,13 @@ def run_server(process_id, expected_clients_nr, file_name, failure_probability,
     :param failure_probability: probability of unsuccessful data transmission over UDP (float between 0 and 1)
     :param pipeline_type: pipelining mechanism for custom protocol over UDP (Go-Back-N or Selective Repeat)
     :param window_size: size of sliding sender window
+    :param integrity_algorithm: name of integrity check used for packets and ACKs of session (see integrity.py)
     :return: None
     """
 
+    # integrity check agreed for whole session (clients must request same algorithm to be registered)
+    integrity_check = integrity.get_integrity_check(integrity_algorithm)
+
     ################################################################################################################
     # file chunking part
 
@@ -105,7 +116,8 @@ def run_server(process_id, expected_clients_nr, file_name, failure_probability,
     server_socket.bind((server_ip, server_port))
 
     print(f"Server {process_id} is reachable at address {server_ip}:{server_port}")
-    print(f"and ready to receive clients requesting download of file '{file_name}'.")
+    print(f"and ready to receive clients requesting download of file '{file_name}' "
+          f"(integrity check: {integrity_algorithm}).")
     print("")
     print("")
 
@@ -116,7 +128,17 @@ def run_server(process_id, expected_clients_nr, file_name, failure_probability,
     while registered_clients_nr < expected_clients_nr:
         # recvfrom()-method returns 2-tuple, 2nd element containing sender socket address included in UDP datagram
         # 4096 indicates socket buffer size (in bytes)
-        _, client_addr = server_socket.recvfrom(4096)       # 2-tuple with format (<host>,<port>)
+        client_request, client_addr = server_socket.recvfrom(4096)       # 2-tuple with format (<host>,<port>)
+
+        # download request "Send <file name> [<integrity algorithm>]" (clients without algorithm use RFC 1071 checksum)
+        request_fields = client_request.decode(errors="replace").split(" ")
+        requested_algorithm = request_fields[2] if len(request_fields) > 2 else integrity.DEFAULT_INTEGRITY_ALGORITHM
+        if requested_algorithm != integrity_algorithm:
+            rejection_message = f"Rejected by server {process_id}: session uses integrity check {integrity_algorithm}."
+            server_socket.sendto(rejection_message.encode(), client_addr)
+            print(f"Client at address {client_addr[0]}:{client_addr[1]} rejected "
+                  f"(requested integrity check {requested_algorithm}).")
+            continue
 
         # add only yet unknown client addresses to registered client addresses backlog
         if client_addr not in registered_clients_addr:
@@ -168,7 +190,7 @@ def run_server(process_id, expected_clients_nr, file_name, failure_probability,
                 # packet construction
                 # -> package payload with checksum and sequence number metadata (pseudo-headers)
                 encoded_sqn_nr = sqn_nr.to_bytes(1, byteorder=sys.byteorder)
-                sender_checksum = unreliable_network.checksum(encoded_sqn_nr + data_chunks[sqn_nr]).encode()
+                sender_checksum = integrity_check(encoded_sqn_nr + data_chunks[sqn_nr]).encode()
                 byte_message = (sender_checksum + ":".encode() +
                                 encoded_sqn_nr + ":".encode()
                                 + data_chunks[sqn_nr])
@@ -177,6 +199,8 @@ def run_server(process_id, expected_clients_nr, file_name, failure_probability,
                 for registered_client in registered_clients_addr:
                     # try sending prepared packet via underlying (unreliable) network to client
                     was_sent = unreliable_network.prob_send(server_socket, byte_message, registered_client, failure_probability)
+                    packet_trace.trace_send(was_sent, packet_trace.EVENT_SEND, server_port, registered_client, sqn_nr,
+                                            len(data_chunks[sqn_nr]))
 
                     # if packet sending was successful, update sending statistics
                     if was_sent:
@@ -192,8 +216,9 @@ def run_server(process_id, expected_clients_nr, file_name, failure_probability,
                     client_packet_timer = threading.Timer(
                         15,
                         retransmission_handler_gbn,
-                        [server_socket, failure_probability, registered_client, last_ack_rcvd_from_client,
-                               data_chunks, sqn_nr, window_end, file_bytes_retransmitted, packets_retransmitted])
+                        [server_socket, failure_probability, integrity_check, registered_client,
+                         last_ack_rcvd_from_client, data_chunks, sqn_nr, window_end, file_bytes_retransmitted,
+                         packets_retransmitted])
                     client_packet_timer.start()
 
             #####################################################################################################
@@ -206,23 +231,36 @@ def run_server(process_id, expected_clients_nr, file_name, failure_probability,
                 server_socket.settimeout(timeout_s)
                 client_message_data, acking_client_addr = server_socket.recvfrom(4096)
 
-                # analyse content of client message
-                client_message_fields = client_message_data.decode().split(":", 2)
-                sender_checksum = client_message_fields[0]
-                acked_sqn_nr = client_message_fields[1]
-                client_payload = client_message_fields[2]
-
-                # check whether ACK message was not corrupted by unreliable network channel
-                recv_checksum = unreliable_network.checksum(acked_sqn_nr.encode() + client_payload.encode())
-
-                if sender_checksum == recv_checksum:
-                    # record received ACK sequence number for ACKing client, only IF NOT an "outdated" ACK !!!
-                    if int(acked_sqn_nr) > last_ack_rcvd_from_client[acking_client_addr]:
-                        # update entry of highest, in-order sequence number acknowledged by that client
-                        # -> Go-Back-N uses "cumulative acknowledgment" scheme
-                        last_ack_rcvd_from_client[acking_client_addr] = int(acked_sqn_nr)
-                        print(f"Received ACK up to file part {acked_sqn_nr}/{len(data_chunks)} "
-                              f"from client {acking_client_addr[0]}:{acking_client_addr[1]}.")
+                # analyse content of client message "<checksum>:<1-byte sequence number>:ACK" as bytestring, since
+                # sequence number is a raw byte (see client_process.py) which may even be ":" itself
+                # -> checksum never contains ":", i.e. first ":" terminates checksum field
+                checksum_end = client_message_data.find(":".encode())
+                is_ack_message = (checksum_end > 0 and acking_client_addr in last_ack_rcvd_from_client
+                                  and client_message_data[checksum_end + 2:] == ":ACK".encode())
+
+                # other datagrams (e.g. repeated download requests, unregistered clients) are ignored
+                if is_ack_message:
+                    sender_checksum = client_message_data[0:checksum_end].decode(errors="replace")
+                    encoded_acked_sqn_nr = client_message_data[checksum_end + 1:checksum_end + 2]
+                    acked_sqn_nr = int.from_bytes(encoded_acked_sqn_nr, byteorder=sys.byteorder)
+
+                    # check whether ACK message was not corrupted by unreliable network channel
+                    recv_checksum = integrity_check(encoded_acked_sqn_nr + "ACK".encode())
+
+                    if sender_checksum == recv_checksum:
+                        packet_trace.trace(packet_trace.EVENT_ACK_RECEIVED, server_port, acking_client_addr,
+                                           acked_sqn_nr, len(client_message_data))
+
+                        # record received ACK sequence number for ACKing client, only IF NOT an "outdated" ACK !!!
+                        if acked_sqn_nr > last_ack_rcvd_from_client[acking_client_addr]:
+                            # update entry of highest, in-order sequence number acknowledged by that client
+                            # -> Go-Back-N uses "cumulative acknowledgment" scheme
+                            last_ack_rcvd_from_client[acking_client_addr] = acked_sqn_nr
+                            print(f"Received ACK up to file part {acked_sqn_nr}/{len(data_chunks)} "
+                                  f"from client {acking_client_addr[0]}:{acking_client_addr[1]}.")
+                    else:
+                        packet_trace.trace(packet_trace.EVENT_CHECKSUM_FAILURE, server_port, acking_client_addr, -1,
+                                           len(client_message_data))
             except socket.timeout:
                 print("")
                 print(f"Resending packets after {timeout_s}s waiting for ACK messages from clients ...")
@@ -265,7 +303,7 @@ def run_server(process_id, expected_clients_nr, file_name, failure_probability,
         # -> program terminates when server process was terminated
         closing_indicator = "12345".encode()
         closing_payload = "DOWNLOAD_COMPLETE".encode()
-        closing_checksum = unreliable_network.checksum(closing_indicator + closing_payload)
+        closing_checksum = integrity_check(closing_indicator + closing_payload).encode()
         byte_closing_message = closing_checksum + ":".encode() + closing_indicator + ":".encode() + closing_payload
 
         for client in registered_clients_addr:
@@ -298,6 +336,11 @@ if __name__ == "__main__":
     failure_probability = float(sys.argv[4])
     pipeline_type = sys.argv[5]
     window_size = int(sys.argv[6])
+    # optional 7th argument: integrity check of session (RFC 1071 checksum if omitted, see integrity.py)
+    integrity_algorithm = sys.argv[7] if len(sys.argv) > 7 else integrity.DEFAULT_INTEGRITY_ALGORITHM
+
+    # optional per-packet tracing (enabled via PACKET_TRACE_DIR environment variable, see packet_trace.py)
+    packet_trace.start_tracing_from_environment("server")
 
     # global variables for sending statistics, displayed after completion of file transmission
     file_bytes_sent = 0
@@ -306,4 +349,4 @@ if __name__ == "__main__":
     packets_retransmitted = 0
 
     run_server(process_id, expected_clients_nr, file_name, failure_probability, pipeline_type, window_size,
-               file_bytes_sent, packets_sent, file_bytes_retransmitted, packets_retransmitted)
+               integrity_algorithm, file_bytes_sent, packets_sent, file_bytes_retransmitted, packets_retransmitted)
@@ -0,0 +1,98 @@
+# imported modules
+import socket               # Python implementation of Berkeley Software Distribution (BSD) socket interface
+import sys
+import time
+import manifest
+import unreliable_network
+
+
+def run_source_server(process_id, file_name, server_port, failure_probability, chunk_size, chunk_delay_s):
+    """
+    Runs a source server process answering chunk requests of multi-source clients (see multi_source_client.py) with
+    simulated network unreliability. In contrast to run_server, the server does not push the file, but publishes a
+    manifest (file size, chunk size, Merkle root) at registration and then sends requested chunks with their Merkle
+    audit path, so that several instances of this server can serve disjoint parts of the same file in parallel.
+
+    :param process_id: identification number for source server process
+    :param file_name: name of file to be served
+    :param server_port: port of source server (several instances on the same host need distinct ports)
+    :param failure_probability: probability of unsuccessful data transmission over UDP (float between 0 and 1)
+    :param chunk_size: size of file data chunks in bytes (chunk, audit path and header must fit into one datagram)
+    :param chunk_delay_s: artificial delay per sent chunk in seconds (simulates slow source, 0 for none)
+    :return: None
+    """
+
+    # read file data and publish manifest of file (see manifest.py)
+    with open(file_name, "rb") as download_file:
+        file_data = download_file.read()
+
+    file_manifest, data_chunks, tree_levels = manifest.build_manifest(file_name, file_data, chunk_size)
+    byte_manifest = manifest.encode_manifest(file_manifest)
+
+    # chunk with audit path and header as well as manifest must fit into single UDP datagrams
+    if not manifest.is_consistent_manifest(file_manifest) or len(byte_manifest) > manifest.MAX_DATAGRAM_SIZE:
+        print(f"Chunk size {chunk_size} bytes too large for UDP datagrams, source server {process_id} not started.")
+        return
+
+    # for security & demonstration reasons, server address is IPv4 loopback address (inaccessible to outer networks)
+    server_ip = "127.0.0.1"
+
+    # instantiate Berkeley Internet socket for IPv4 address family (AF_INET) & UDP socket type (SOCK_DGRAM)
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server_socket.bind((server_ip, server_port))
+
+    print(f"Source server {process_id} is reachable at address {server_ip}:{server_port}")
+    print(f"and serves '{file_name}' in {file_manifest['chunks_nr']} chunks of {chunk_size} bytes "
+          f"(Merkle root {file_manifest['merkle_root']}).")
+    print("")
+
+    # sending statistics
+    file_bytes_sent = 0
+    packets_sent = 0
+
+    # request loop, answering (stateless) requests of any client
+    # -> "Send <file name>": client registration, answered by manifest
+    # -> "Get <file name> <chunk number> [<chunk number> ...]": batch of chunk requests
+    while True:
+        client_message, client_addr = server_socket.recvfrom(65535)
+        request_fields = client_message.decode(errors="replace").split(" ")
+
+        if len(request_fields) == 2 and request_fields[0] == "Send" and request_fields[1] == file_name:
+            # manifest is resent whenever requested (client retries if manifest was lost)
+            unreliable_network.prob_send(server_socket, byte_manifest, client_addr, failure_probability)
+            print(f"Sent manifest of '{file_name}' to client {client_addr[0]}:{client_addr[1]}.")
+
+        elif len(request_fields) > 2 and request_fields[0] == "Get" and request_fields[1] == file_name:
+            for chunk_field in request_fields[2:]:
+                if not chunk_field.isdigit() or int(chunk_field) >= len(data_chunks):
+                    continue
+                chunk_nr = int(chunk_field)
+
+                # packet construction: "Chunk:<chunk number>:" + audit path (proof_length * 32 bytes) + chunk data
+                byte_message = (f"Chunk:{chunk_nr}:".encode() +
+                                manifest.merkle_proof(tree_levels, chunk_nr) +
+                                data_chunks[chunk_nr])
+
+                if chunk_delay_s > 0:
+                    time.sleep(chunk_delay_s)
+
+                # try sending prepared packet via underlying (unreliable) network to client
+                if unreliable_network.prob_send(server_socket, byte_message, client_addr, failure_probability):
+                    file_bytes_sent += len(data_chunks[chunk_nr])
+                    packets_sent += 1
+
+                    if packets_sent % 1000 == 0:
+                        print(f"Source server {process_id}: {packets_sent} chunks ({file_bytes_sent} bytes) sent.")
+
+
+# run source server script, e.g. python3 source_server.py 1 <file> 2025 0.1 [chunk size] [delay per chunk]
+if __name__ == "__main__":
+    process_id = int(sys.argv[1])
+    file_name = sys.argv[2]
+    server_port = int(sys.argv[3])
+    failure_probability = float(sys.argv[4])
+    # optional arguments: chunk size in bytes and artificial delay per chunk in seconds (slow source simulation)
+    chunk_size = int(sys.argv[5]) if len(sys.argv) > 5 else 32768
+    chunk_delay_s = float(sys.argv[6]) if len(sys.argv) > 6 else 0
+
+    run_source_server(process_id, file_name, server_port, failure_probability, chunk_size, chunk_delay_s)
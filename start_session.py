@@ -1,6 +1,7 @@
 # imported modules
 import subprocess
 import sys
+import integrity
 
 
 def main():
@@ -13,15 +14,21 @@ def main():
     probability = float(sys.argv[4])
     protocol = sys.argv[5]
     window_size = int(sys.argv[6])
+    # optional 7th argument: integrity check agreed for whole session ("rfc1071" (default), "crc32" or "crc32c")
+    integrity_algorithm = sys.argv[7] if len(sys.argv) > 7 else integrity.DEFAULT_INTEGRITY_ALGORITHM
+    # reject unknown integrity check before spawning any child process (raises ValueError, see integrity.py)
+    integrity.get_integrity_check(integrity_algorithm)
 
     # start server child process from this parent process (here)
+    # -> command line arguments of child processes must be strings
     server_process = subprocess.Popen(["python3", "server_process.py",
-                                       id_process, number_of_processes, filename, probability, protocol, window_size])
+                                       str(id_process), str(number_of_processes), filename, str(probability), protocol,
+                                       str(window_size), integrity_algorithm])
 
     # start client child process(es) from this parent process (here)
     for client_instance in range(number_of_processes):
         client_process = subprocess.Popen(["python3", "client_process.py",
-                                           filename, probability, protocol, window_size])
+                                           filename, str(probability), protocol, str(window_size), integrity_algorithm])
 
     # wait until server process has completed file transmission to ALL child processes before application shutdown
     server_process.wait()
@@ -0,0 +1,233 @@
+# imported modules
+import sys
+import load_generator
+import packet_trace
+
+
+def analyse_goodput(records, bin_s):
+    """
+    Rebuilds goodput over time, i.e. new (in-order) file data delivered to clients per time bin
+
+    :param records: chronologically ordered trace records of all processes (see packet_trace.read_trace function)
+    :param bin_s: width of time bins in seconds
+    :return: list of 2-tuples (<start of time bin in seconds since first record>, <goodput in bytes per second>)
+    """
+
+    if not records:
+        return list()
+
+    first_timestamp = records[0][0]
+    bin_ns = int(bin_s * 1e9)
+    delivered_bytes = [0] * ((records[-1][0] - first_timestamp) // bin_ns + 1)
+
+    for timestamp, event, flags, _, _, _, packet_size, role in records:
+        # only in-order packets carry new file data for client (duplicates and re-ordered packets are discarded)
+        if role == "client" and event == packet_trace.EVENT_RECEIVE and flags & packet_trace.FLAG_IN_ORDER:
+            delivered_bytes[(timestamp - first_timestamp) // bin_ns] += packet_size
+
+    return [(bin_nr * bin_s, bin_bytes / bin_s) for bin_nr, bin_bytes in enumerate(delivered_bytes)]
+
+
+def analyse_window_occupancy(records, bin_s):
+    """
+    Rebuilds sender window occupancy over time from server records, i.e. number of packets sent but not yet
+    (cumulatively) acknowledged, summed over all clients and sampled at the end of each time bin
+
+    :param records: chronologically ordered trace records of all processes
+    :param bin_s: width of time bins in seconds
+    :return: 2-tuple (<list of 2-tuples (<start of time bin in seconds>, <outstanding packets>)>,
+             <dictionary mapping client addresses to their maximum number of outstanding packets>)
+    """
+
+    if not records:
+        return list(), dict()
+
+    first_timestamp = records[0][0]
+    bin_ns = int(bin_s * 1e9)
+    highest_sent = dict()
+    highest_acked = dict()
+    max_outstanding = dict()
+    occupancy = list()
+    current_bin = 0
+
+    for timestamp, event, _, _, peer_address, sqn_nr, _, role in records:
+        if role != "server":
+            continue
+
+        # sample occupancy for all time bins completed before this record
+        while (timestamp - first_timestamp) // bin_ns > current_bin:
+            occupancy.append((current_bin * bin_s, sum(highest_sent[client] - highest_acked.get(client, -1)
+                                                       for client in highest_sent)))
+            current_bin += 1
+
+        # packets dropped by simulated network (server only sends data packets) are outstanding for sender as well
+        if event in (packet_trace.EVENT_SEND, packet_trace.EVENT_RETRANSMIT, packet_trace.EVENT_DROP):
+            highest_sent[peer_address] = max(highest_sent.get(peer_address, -1), sqn_nr)
+        elif event == packet_trace.EVENT_ACK_RECEIVED:
+            highest_acked[peer_address] = max(highest_acked.get(peer_address, -1), sqn_nr)
+        else:
+            continue
+
+        outstanding = highest_sent.get(peer_address, -1) - highest_acked.get(peer_address, -1)
+        max_outstanding[peer_address] = max(max_outstanding.get(peer_address, 0), outstanding)
+
+    occupancy.append((current_bin * bin_s, sum(highest_sent[client] - highest_acked.get(client, -1)
+                                               for client in highest_sent)))
+    return occupancy, max_outstanding
+
+
+def analyse_rtt(records):
+    """
+    Computes round trip time samples from server records, between sending of a packet and receipt of its ACK.
+    According to Karn's algorithm, packets sent more than once before their ACK arrived are ambiguous and skipped.
+
+    :param records: chronologically ordered trace records of all processes
+    :return: sorted list of round trip times in seconds
+    """
+
+    # (client address, sequence number) -> timestamp of only transmission, None if transmitted several times
+    send_timestamps = dict()
+    rtt_samples = list()
+
+    for timestamp, event, _, _, peer_address, sqn_nr, _, role in records:
+        if role != "server":
+            continue
+
+        packet_key = (peer_address, sqn_nr)
+        if event in (packet_trace.EVENT_SEND, packet_trace.EVENT_RETRANSMIT):
+            send_timestamps[packet_key] = timestamp if packet_key not in send_timestamps else None
+        elif event == packet_trace.EVENT_ACK_RECEIVED and send_timestamps.get(packet_key) is not None:
+            rtt_samples.append((timestamp - send_timestamps[packet_key]) / 1e9)
+            # later duplicate ACKs for same sequence number must not produce further samples
+            send_timestamps[packet_key] = None
+
+    rtt_samples.sort()
+    return rtt_samples
+
+
+def analyse_stalls(records, stall_threshold_s):
+    """
+    Detects per-client stall periods, i.e. intervals longer than the threshold without download progress of a client.
+    Progress is an in-order packet received by the client or an ACK from the client received by the server.
+
+    :param records: chronologically ordered trace records of all processes
+    :param stall_threshold_s: minimum duration of a stall period in seconds
+    :return: dictionary mapping client ports to lists of 2-tuples (<stall start in seconds since first record>,
+             <stall duration in seconds>)
+    """
+
+    if not records:
+        return dict()
+
+    first_timestamp = records[0][0]
+    last_progress = dict()
+    progress_sqn_nr = dict()
+    stalls = dict()
+
+    # last sequence number of file, i.e. highest sequence number of any file data packet in trace
+    last_sqn_nr = max((record[5] for record in records if record[1] in (packet_trace.EVENT_SEND,
+                       packet_trace.EVENT_RETRANSMIT, packet_trace.EVENT_RECEIVE)), default=-1)
+
+    for timestamp, event, flags, local_port, peer_address, sqn_nr, _, role in records:
+        # client identified by its port, seen as local port in client traces and as peer port in server traces
+        if role == "client" and event == packet_trace.EVENT_RECEIVE and flags & packet_trace.FLAG_IN_ORDER:
+            client_port = local_port
+        elif role == "server" and event == packet_trace.EVENT_ACK_RECEIVED:
+            client_port = peer_address[1]
+        else:
+            continue
+
+        previous_progress = last_progress.get(client_port, first_timestamp)
+        if (timestamp - previous_progress) / 1e9 > stall_threshold_s:
+            stalls.setdefault(client_port, list()).append(((previous_progress - first_timestamp) / 1e9,
+                                                           (timestamp - previous_progress) / 1e9))
+        last_progress[client_port] = timestamp
+        progress_sqn_nr[client_port] = max(progress_sqn_nr.get(client_port, -1), sqn_nr)
+
+    # clients without progress until end of trace are stalled as well (e.g. download never completed), unless they
+    # already received or acknowledged the last file data packet (e.g. waiting for closing message of server)
+    last_timestamp = records[-1][0]
+    for client_port, previous_progress in last_progress.items():
+        if progress_sqn_nr[client_port] == last_sqn_nr:
+            continue
+        if (last_timestamp - previous_progress) / 1e9 > stall_threshold_s:
+            stalls.setdefault(client_port, list()).append(((previous_progress - first_timestamp) / 1e9,
+                                                           (last_timestamp - previous_progress) / 1e9))
+
+    return stalls
+
+
+def print_analysis(trace_file_names, bin_s, stall_threshold_s):
+    """
+    Merges trace files of a transmission session and prints goodput, window occupancy, RTT distribution and stalls
+
+    :param trace_file_names: list of trace file names (written by server and client processes of one session)
+    :param bin_s: width of time bins in seconds
+    :param stall_threshold_s: minimum duration of a stall period in seconds
+    :return: None
+    """
+
+    # merge records of all processes (timestamps of monotonic clock are comparable among processes of same host)
+    records = list()
+    for trace_file_name in trace_file_names:
+        role, records_written, file_records = packet_trace.read_trace(trace_file_name)
+        print(f"{trace_file_name}: {role} trace with {len(file_records)} records"
+              + (f" ({records_written - len(file_records)} oldest records overwritten)"
+                 if records_written > len(file_records) else ""))
+        records.extend(file_records)
+    records.sort(key=lambda record: record[0])
+
+    if not records:
+        print("No records found.")
+        return
+
+    event_counts = dict()
+    for record in records:
+        event_counts[record[1]] = event_counts.get(record[1], 0) + 1
+
+    print("")
+    print(f"--------------------------------------------------------------------------------------------")
+    print(f"Session duration: {(records[-1][0] - records[0][0]) / 1e9:.3f}s")
+    for event, event_name in packet_trace.EVENT_NAMES.items():
+        print(f"{event_name:>18}: {event_counts.get(event, 0)}")
+
+    print(f"--------------------------------------------------------------------------------------------")
+    print(f"{'time':>10} {'goodput':>14} {'outstanding':>12}")
+    goodput = analyse_goodput(records, bin_s)
+    occupancy, max_outstanding = analyse_window_occupancy(records, bin_s)
+    occupancy_by_bin = dict(occupancy)
+    for bin_start, bin_goodput in goodput:
+        print(f"{bin_start:9.3f}s {bin_goodput / 1000000:10.3f}MB/s {occupancy_by_bin.get(bin_start, 0):12d}")
+    for client_address, outstanding in sorted(max_outstanding.items()):
+        print(f"Maximum window occupancy of client {client_address[0]}:{client_address[1]}: {outstanding} packets")
+
+    print(f"--------------------------------------------------------------------------------------------")
+    rtt_samples = analyse_rtt(records)
+    if rtt_samples:
+        print(f"RTT samples (Karn's algorithm): {len(rtt_samples)}")
+        for label, fraction in (("min", 0.0), ("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+            print(f"RTT {label}: {load_generator.percentile(rtt_samples, fraction) * 1000:.3f}ms")
+        print(f"RTT max: {rtt_samples[-1] * 1000:.3f}ms")
+    else:
+        print("No unambiguous RTT samples (server trace missing or all packets sent several times).")
+
+    print(f"--------------------------------------------------------------------------------------------")
+    stalls = analyse_stalls(records, stall_threshold_s)
+    if not stalls:
+        print(f"No stall periods longer than {stall_threshold_s}s.")
+    for client_port, client_stalls in sorted(stalls.items()):
+        print(f"Client port {client_port}: {len(client_stalls)} stalls, "
+              f"{sum(duration for _, duration in client_stalls):.3f}s in total, longest "
+              f"{max(duration for _, duration in client_stalls):.3f}s")
+        for stall_start, stall_duration in client_stalls:
+            print(f"    stalled at {stall_start:.3f}s for {stall_duration:.3f}s")
+    print(f"--------------------------------------------------------------------------------------------")
+
+
+# analyse trace files recorded with PACKET_TRACE_DIR set, e.g. python3 trace_analyzer.py 0.5 1.0 traces/*.trace
+if __name__ == "__main__":
+    bin_s = float(sys.argv[1])
+    stall_threshold_s = float(sys.argv[2])
+    trace_file_names = sys.argv[3:]
+
+    print_analysis(trace_file_names, bin_s, stall_threshold_s)
@@ -93,3 +93,20 @@ def prob_send(sender_socket, byte_data, receiver_address, failure_probability):
         return True
     else:
         return False
+
+
+def flip_bits(byte_data, bit_flips_nr):
+    """
+    Helper function simulating bit-flipping errors of an unreliable network channel (bit-corruption loss model), by
+    inverting the specified number of distinct, pseudo-randomly chosen bits of the data
+
+    :param byte_data: data to be corrupted (in bytestring format)
+    :param bit_flips_nr: number of bits to be flipped (at most 8 times the data length)
+    :return: corrupted copy of data (bytestring)
+    """
+
+    corrupted_data = bytearray(byte_data)
+    for bit_position in random.sample(range(len(corrupted_data) * 8), bit_flips_nr):
+        corrupted_data[bit_position // 8] ^= 1 << (bit_position % 8)
+
+    return bytes(corrupted_data)